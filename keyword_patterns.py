@@ -0,0 +1,23 @@
+"""Regex helpers shared by the classifier pages."""
+import re
+from typing import Dict, Iterable
+
+
+def trie_regex(keywords: Iterable[str]) -> str:
+    """Build a shared-prefix regex, e.g. ``limited(?: time| run)?`` for three keywords."""
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}  # marks the end of a keyword
+
+    def node_regex(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + node_regex(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) > 1:
+            return "(?:" + "|".join(branches) + ")" + ("?" if "" in node else "")
+        return "(?:" + branches[0] + ")?" if "" in node else branches[0]
+
+    return node_regex(trie)
@@ -1,7 +1,18 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import json
-from io import StringIO
+import re
+from io import BytesIO, StringIO
+
+import ahocorasick
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+try:
+    import hyperscan
+except ImportError:  # optional SIMD matcher; the Aho-Corasick automaton is used without it
+    hyperscan = None
 
 # Page configuration
 st.set_page_config(
@@ -10,49 +21,136 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize session state for dictionaries
+# Default marketing tactic dictionaries
+DEFAULT_DICTIONARIES = {
+    'urgency_marketing': [
+        'limited', 'limited time', 'limited run', 'limited edition', 'order now',
+        'last chance', 'hurry', 'while supplies last', 'before they\'re gone',
+        'selling out', 'selling fast', 'act now', 'don\'t wait', 'today only',
+        'expires soon', 'final hours', 'almost gone'
+    ],
+    'exclusive_marketing': [
+        'exclusive', 'exclusively', 'exclusive offer', 'exclusive deal',
+        'members only', 'vip', 'special access', 'invitation only',
+        'premium', 'privileged', 'limited access', 'select customers',
+        'insider', 'private sale', 'early access'
+    ]
+}
+
+# Initialize session state for dictionaries (copied, since the editor mutates the lists)
 if 'dictionaries' not in st.session_state:
     st.session_state.dictionaries = {
-        'urgency_marketing': [
-            'limited', 'limited time', 'limited run', 'limited edition', 'order now',
-            'last chance', 'hurry', 'while supplies last', 'before they\'re gone',
-            'selling out', 'selling fast', 'act now', 'don\'t wait', 'today only',
-            'expires soon', 'final hours', 'almost gone'
-        ],
-        'exclusive_marketing': [
-            'exclusive', 'exclusively', 'exclusive offer', 'exclusive deal',
-            'members only', 'vip', 'special access', 'invitation only',
-            'premium', 'privileged', 'limited access', 'select customers',
-            'insider', 'private sale', 'early access'
-        ]
+        tactic: list(keywords) for tactic, keywords in DEFAULT_DICTIONARIES.items()
     }
 
 if 'classified_data' not in st.session_state:
     st.session_state.classified_data = None
 
-def classify_statement(text, dictionaries):
-    """Classify a statement based on marketing tactic dictionaries."""
-    if pd.isna(text) or not text:
-        return {}
-    
-    text_lower = str(text).lower()
-    results = {}
+def build_matcher(dictionaries):
+    """Compile the keywords of every tactic into one multi-pattern matcher.
     
+    Returns ``(engine, entries)`` where the engine reports keyword ids and
+    ``entries[id]`` lists the ``(tactic, keyword)`` pairs behind that id.
+    """
+    keyword_ids = {}
+    entries = []
     for tactic, keywords in dictionaries.items():
-        matches = []
         for keyword in keywords:
-            if keyword.lower() in text_lower:
-                matches.append(keyword)
-        
-        results[tactic] = {
-            'present': len(matches) > 0,
-            'count': len(matches),
-            'matches': matches
-        }
+            key = keyword.lower()
+            if not key:
+                continue
+            if key not in keyword_ids:
+                keyword_ids[key] = len(entries)
+                entries.append([])
+            entries[keyword_ids[key]].append((tactic, keyword))
+    
+    if not entries:
+        return None, entries
+    
+    if hyperscan is not None:
+        engine = hyperscan.Database()
+        engine.compile(
+            expressions=[re.escape(key).encode() for key in keyword_ids],
+            ids=list(keyword_ids.values()),
+            elements=len(keyword_ids),
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(keyword_ids)
+        )
+    else:
+        engine = ahocorasick.Automaton()
+        for key, keyword_id in keyword_ids.items():
+            engine.add_word(key, (keyword_id, len(key)))
+        engine.make_automaton()
+    return engine, entries
+
+def new_scratch(engine):
+    """Allocate Hyperscan scratch space for one caller; ``None`` for other engines.
+    
+    The database is shared across sessions by default_matcher, and one scratch
+    space cannot serve two concurrent scans.
+    """
+    if hyperscan is not None and isinstance(engine, hyperscan.Database):
+        return hyperscan.Scratch(engine)
+    return None
+
+def find_keyword_hits(text_lower, engine, scratch=None):
+    """Return ``(start, end, keyword_id)`` for every keyword occurrence, ordered by position."""
+    hits = []
+    if isinstance(engine, ahocorasick.Automaton):
+        for last, (keyword_id, length) in engine.iter(text_lower):
+            hits.append((last + 1 - length, last + 1, keyword_id))
+    else:
+        engine.scan(
+            text_lower.encode(),
+            match_event_handler=lambda keyword_id, start, end, flags, context: hits.append((start, end, keyword_id)),
+            scratch=scratch or new_scratch(engine)
+        )
+    # Leftmost first and, at the same start, longest first
+    return sorted(hits, key=lambda hit: (hit[0], -hit[1]))
+
+def dictionaries_version(dictionaries):
+    """Hash the dictionaries so their compiled matcher can be reused until they change."""
+    return hash(tuple((tactic, tuple(keywords)) for tactic, keywords in dictionaries.items()))
+
+@st.cache_resource(show_spinner=False)
+def default_matcher():
+    """Build the matcher for DEFAULT_DICTIONARIES once per server process."""
+    return build_matcher(DEFAULT_DICTIONARIES)
+
+def get_matcher(dictionaries):
+    """Return the cached matcher and its version, rebuilding it only after an edit."""
+    version = dictionaries_version(dictionaries)
+    if st.session_state.get('_matcher_ver') != version:
+        if dictionaries == DEFAULT_DICTIONARIES:
+            st.session_state._matcher = default_matcher()
+        else:
+            st.session_state._matcher = build_matcher(dictionaries)
+        st.session_state._matcher_ver = version
+    return st.session_state._matcher, version
+
+def classify_statement(text_lower, matcher, tactics, overlapping=False, scratch=None):
+    """Return the keywords of each tactic found in an already-lowercased statement."""
+    engine, entries = matcher
+    found = {tactic: [] for tactic in tactics}
+    if not text_lower or engine is None:
+        return found
     
-    return results
+    # A single pass over the text reports every keyword of every tactic; unless
+    # overlapping matches are requested, a keyword nested inside a longer keyword
+    # of the same tactic is skipped ('limited time' no longer also counts 'limited')
+    covered_to = dict.fromkeys(tactics, 0)
+    for start, end, keyword_id in find_keyword_hits(text_lower, engine, scratch):
+        kept = [
+            (tactic, keyword) for tactic, keyword in entries[keyword_id]
+            if overlapping or end > covered_to[tactic]
+        ]
+        for tactic, keyword in kept:
+            covered_to[tactic] = max(covered_to[tactic], end)
+            if keyword not in found[tactic]:
+                found[tactic].append(keyword)
+    
+    return found
 
-def process_data(df, dictionaries):
+def process_data(df, dictionaries, matcher, overlapping=False):
     """Process the uploaded data and classify statements."""
     # Find statement column
     statement_col = None
@@ -64,22 +162,57 @@ def process_data(df, dictionaries):
     if statement_col is None:
         statement_col = df.columns[1] if len(df.columns) > 1 else df.columns[0]
     
-    # Apply classification
-    df['classification'] = df[statement_col].apply(lambda x: classify_statement(x, dictionaries))
+    # Lowercase every statement once up front
+    lowered = df[statement_col].astype("string").fillna("").str.lower()
     
-    # Extract results to separate columns
-    for tactic in dictionaries.keys():
-        df[f'{tactic}_present'] = df['classification'].apply(
-            lambda x: x.get(tactic, {}).get('present', False)
-        )
-        df[f'{tactic}_count'] = df['classification'].apply(
-            lambda x: x.get(tactic, {}).get('count', 0)
-        )
-        df[f'{tactic}_matches'] = df['classification'].apply(
-            lambda x: ', '.join(x.get(tactic, {}).get('matches', []))
-        )
+    # Classify each distinct statement once; repeated rows share its result
+    codes, unique_statements = pd.factorize(lowered)
+    n_unique = len(unique_statements)
+    
+    # Single pass over distinct statements, filling preallocated per-tactic result arrays
+    tactics = list(dictionaries.keys())
+    # A tactic's count never exceeds its keyword total, so most fit in int8
+    counts = {
+        tactic: np.empty(n_unique, dtype=np.int8 if len(dictionaries[tactic]) <= 127 else np.int32)
+        for tactic in tactics
+    }
+    matches = {tactic: np.empty(n_unique, dtype=object) for tactic in tactics}
+    scratch = new_scratch(matcher[0])
+    for i, text_lower in enumerate(unique_statements):
+        for tactic, found in classify_statement(text_lower, matcher, tactics, overlapping, scratch).items():
+            counts[tactic][i] = len(found)
+            matches[tactic][i] = ', '.join(found)
     
-    return df, statement_col
+    # Broadcast results back to every row without copying the uploaded data
+    new_cols = {}
+    for tactic in tactics:
+        row_counts = counts[tactic][codes]
+        match_codes, match_strings = pd.factorize(matches[tactic])
+        new_cols[f'{tactic}_present'] = row_counts > 0
+        new_cols[f'{tactic}_count'] = row_counts
+        new_cols[f'{tactic}_matches'] = pd.Categorical.from_codes(match_codes[codes], categories=match_strings)
+    
+    return df.assign(**new_cols), statement_col
+
+def to_csv_bytes(df):
+    """Serialize a DataFrame to CSV bytes with Arrow's C++ writer."""
+    buffer = BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buffer)
+    return buffer.getvalue()
+
+# Uploads can be large and these caches are shared by every session, so keep only recent ones
+@st.cache_data(show_spinner=False, max_entries=4, ttl="1h")
+def load_csv(file_bytes):
+    """Parse an uploaded CSV into Arrow-backed columns, cached per file content."""
+    return pd.read_csv(BytesIO(file_bytes), dtype_backend="pyarrow")
+
+@st.cache_data(show_spinner=False, max_entries=8, ttl="1h")
+def classify_upload(file_bytes, matcher_version, overlapping, _dictionaries, _matcher):
+    """Classify an uploaded CSV, cached per file content and dictionary version."""
+    return process_data(load_csv(file_bytes), _dictionaries, _matcher, overlapping)
+
+# Build the default matcher while the page loads rather than on the first Classify click
+default_matcher()
 
 # Header
 st.title("📊 Marketing Tactics Classifier")
@@ -95,15 +228,26 @@ with tab1:
     uploaded_file = st.file_uploader("Choose a CSV file", type=['csv'])
     
     if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file)
+        df = load_csv(uploaded_file.getvalue())
         st.success(f"✅ File uploaded successfully! {len(df)} rows loaded.")
         
         st.subheader("Preview of uploaded data")
         st.dataframe(df.head(10), use_container_width=True)
         
+        overlapping = st.checkbox(
+            "Count keywords nested inside longer matches",
+            value=False,
+            help="A keyword inside a longer keyword of the same tactic is not counted: "
+                 "'limited time' counts only 'limited time'. Tick to also count 'limited'."
+        )
+        
         if st.button("🚀 Classify Data", type="primary", use_container_width=True):
             with st.spinner("Classifying statements..."):
-                classified_df, statement_col = process_data(df.copy(), st.session_state.dictionaries)
+                matcher, matcher_version = get_matcher(st.session_state.dictionaries)
+                classified_df, statement_col = classify_upload(
+                    uploaded_file.getvalue(), matcher_version, overlapping,
+                    st.session_state.dictionaries, matcher
+                )
                 st.session_state.classified_data = classified_df
                 st.session_state.statement_col = statement_col
                 st.success("✅ Classification complete! Go to the Results tab to view.")
@@ -249,19 +393,16 @@ with tab3:
             ["All"] + list(st.session_state.dictionaries.keys())
         )
         
-        display_df = df.copy()
+        display_df = df
         if filter_tactic != "All":
             display_df = display_df[display_df[f'{filter_tactic}_present']]
         
-        # Display columns
-        display_cols = [col for col in df.columns if col not in ['classification']]
-        st.dataframe(display_df[display_cols], use_container_width=True)
+        st.dataframe(display_df, use_container_width=True)
         
         # Download results
-        csv = display_df[display_cols].to_csv(index=False)
         st.download_button(
             label="📥 Download Results (CSV)",
-            data=csv,
+            data=to_csv_bytes(display_df),
             file_name="classified_data.csv",
             mime="text/csv",
             use_container_width=True
@@ -1,6 +1,19 @@
+import io
+import re
+import threading
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
 
+from keyword_patterns import trie_regex
+
+try:
+    from numba import njit, prange
+except ImportError:  # optional JIT kernel; flags fall back to the compiled regex
+    njit = None
+
 # Page configuration
 st.set_page_config(
     page_title="📊 Codex Keyword Classifier",
@@ -27,6 +40,12 @@ DEFAULT_EXCLUSIVE = [
     "early access",
 ]
 
+# Text area session keys backing each tactic's keyword dictionary
+KEYWORD_FIELDS = {
+    "urgency_marketing": "urgency_text",
+    "exclusive_marketing": "exclusive_text",
+}
+
 
 def _initialize_state():
     """Ensure editable text areas keep user input between reruns."""
@@ -38,13 +57,29 @@ def _initialize_state():
         st.session_state.classified_df = None
     if "statement_column" not in st.session_state:
         st.session_state.statement_column = "Statement"
+    if "keyword_map" not in st.session_state:
+        st.session_state.keyword_map = {
+            tactic: _parse_keywords(st.session_state[field]) for tactic, field in KEYWORD_FIELDS.items()
+        }
 
 
-def _parse_keywords(block: str) -> list[str]:
-    """Convert newline-delimited textarea input into a list of keywords."""
+def _parse_keywords(block: str) -> frozenset[str]:
+    """Convert newline-delimited textarea input into a set of lowercased keywords."""
     if not block:
-        return []
-    return [line.strip() for line in block.splitlines() if line.strip()]
+        return frozenset()
+    return frozenset(line.strip().lower() for line in block.splitlines() if line.strip())
+
+
+def _store_keywords() -> None:
+    """Re-parse every tactic's keywords when the dictionary form is saved."""
+    for tactic, field in KEYWORD_FIELDS.items():
+        st.session_state.keyword_map[tactic] = _parse_keywords(st.session_state[field])
+
+
+@st.cache_data(show_spinner=False, max_entries=4, ttl="1h")
+def _read_csv(file_bytes: bytes) -> pd.DataFrame:
+    """Parse the uploaded CSV once per distinct file content, keeping only recent uploads."""
+    return pd.read_csv(io.BytesIO(file_bytes), dtype_backend="pyarrow")
 
 
 def _detect_statement_column(df: pd.DataFrame) -> str | None:
@@ -55,21 +90,82 @@ def _detect_statement_column(df: pd.DataFrame) -> str | None:
     return None
 
 
-def _apply_classification(df: pd.DataFrame, column: str, keyword_map: dict[str, list[str]]):
-    """Add dictionary flag columns to the provided DataFrame."""
-    working_df = df.copy()
-    statements = working_df[column].fillna("").astype(str)
-
-    for tactic, words in keyword_map.items():
-        lowered_keywords = [word.lower() for word in words if word.strip()]
-
-        def has_match(text: str) -> int:
-            text_lower = text.lower()
-            return int(any(keyword in text_lower for keyword in lowered_keywords))
-
-        working_df[f"{tactic}_flag"] = statements.apply(has_match)
-
-    return working_df
+@st.cache_resource(show_spinner=False)
+def _compile_keyword_pattern(keywords: frozenset[str]) -> re.Pattern | None:
+    """Compile lowercased keywords into one trie-shaped regex reused across runs."""
+    if not keywords:
+        return None
+    return re.compile(trie_regex(keywords))
+
+
+def _utf8_buffers(values) -> tuple[np.ndarray, np.ndarray]:
+    """Return the contiguous UTF-8 bytes and int64 offsets of a sequence of strings."""
+    array = pa.array(values, type=pa.large_string())
+    if isinstance(array, pa.ChunkedArray):
+        # Arrow-backed columns arrive chunked (or with no chunks at all when empty)
+        array = array.combine_chunks() if array.num_chunks else pa.array([], type=pa.large_string())
+    _, offsets, data = array.buffers()
+    offsets = np.frombuffer(offsets, dtype=np.int64)[array.offset : array.offset + len(array) + 1]
+    data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.empty(0, dtype=np.uint8)
+    return data, offsets
+
+
+@st.cache_resource(show_spinner=False)
+def _flag_kernel():
+    """Return the Numba keyword-scan kernel, kept alive across reruns so it JIT-compiles once."""
+    if njit is None:
+        return None
+
+    @njit(parallel=True)
+    def scan_flags(text_data, text_offsets, keyword_data, keyword_offsets):
+        flags = np.zeros(len(text_offsets) - 1, dtype=np.int8)
+        for row in prange(len(text_offsets) - 1):
+            start, end = text_offsets[row], text_offsets[row + 1]
+            for k in range(len(keyword_offsets) - 1):
+                k_start = keyword_offsets[k]
+                width = keyword_offsets[k + 1] - k_start
+                for pos in range(start, end - width + 1):
+                    matched = 0
+                    while matched < width and text_data[pos + matched] == keyword_data[k_start + matched]:
+                        matched += 1
+                    if matched == width:
+                        flags[row] = 1
+                        break
+                if flags[row]:
+                    break
+        return flags
+
+    # The dispatcher is shared by every session thread, and numba's fallback
+    # workqueue threading layer aborts the process on concurrent parallel calls
+    lock = threading.Lock()
+
+    def locked_scan_flags(*buffers):
+        with lock:
+            return scan_flags(*buffers)
+
+    return locked_scan_flags
+
+
+def _apply_classification(df: pd.DataFrame, column: str, keyword_map: dict[str, frozenset[str]]):
+    """Return the DataFrame with one dictionary flag column added per tactic."""
+    statements = df[column].astype("string").fillna("").str.lower()
+    scan_flags = _flag_kernel()
+    if scan_flags is not None:
+        text_data, text_offsets = _utf8_buffers(statements)
+
+    flags = {}
+    for tactic, keywords in keyword_map.items():
+        pattern = _compile_keyword_pattern(keywords)
+        if pattern is None:
+            flags[f"{tactic}_flag"] = pd.Series(0, index=df.index, dtype="int8")
+        elif scan_flags is not None:
+            flags[f"{tactic}_flag"] = pd.Series(
+                scan_flags(text_data, text_offsets, *_utf8_buffers(sorted(keywords))), index=df.index
+            )
+        else:
+            flags[f"{tactic}_flag"] = statements.str.contains(pattern).astype("int8")
+
+    return df.assign(**flags)
 
 
 _initialize_state()
@@ -87,51 +183,44 @@ uploaded_file = st.sidebar.file_uploader(
 )
 
 st.sidebar.header("Keyword Dictionaries")
-urgency_keywords_raw = st.sidebar.text_area(
-    "urgency_marketing keywords (one per line)",
-    key="urgency_text",
-    height=150,
-)
-exclusive_keywords_raw = st.sidebar.text_area(
-    "exclusive_marketing keywords (one per line)",
-    key="exclusive_text",
-    height=150,
-)
+with st.sidebar.form("dict_editor"):
+    for tactic, field in KEYWORD_FIELDS.items():
+        st.text_area(
+            f"{tactic} keywords (one per line)",
+            key=field,
+            height=150,
+        )
+    st.form_submit_button("Save dictionaries", on_click=_store_keywords)
 
 run_clicked = st.sidebar.button("Run classification", type="primary")
 
+input_df = None
+if uploaded_file:
+    try:
+        input_df = _read_csv(uploaded_file.getvalue())
+    except Exception as exc:
+        st.sidebar.error(f"Unable to read CSV: {exc}")
+
 if run_clicked:
     if uploaded_file is None:
         st.sidebar.error("Please upload a CSV file before running the classifier.")
-    else:
-        try:
-            uploaded_file.seek(0)
-            input_df = pd.read_csv(uploaded_file)
-        except Exception as exc:
-            st.sidebar.error(f"Unable to read CSV: {exc}")
-            input_df = None
-
-        if input_df is not None:
-            statement_col = _detect_statement_column(input_df)
-            if statement_col is None:
-                st.sidebar.error("No `Statement` column found. Please add one to your CSV.")
-            else:
-                keywords = {
-                    "urgency_marketing": _parse_keywords(urgency_keywords_raw),
-                    "exclusive_marketing": _parse_keywords(exclusive_keywords_raw),
-                }
-                classified_df = _apply_classification(input_df, statement_col, keywords)
-                st.session_state.classified_df = classified_df
-                st.session_state.statement_column = statement_col
-                st.success("Classification complete! See the results below.")
+    elif input_df is not None:
+        statement_col = _detect_statement_column(input_df)
+        if statement_col is None:
+            st.sidebar.error("No `Statement` column found. Please add one to your CSV.")
+        else:
+            classified_df = _apply_classification(
+                input_df, statement_col, st.session_state.keyword_map
+            )
+            st.session_state.classified_df = classified_df
+            st.session_state.statement_column = statement_col
+            st.success("Classification complete! See the results below.")
 
 # Main content
-if uploaded_file:
-    uploaded_file.seek(0)
-    preview_df = pd.read_csv(uploaded_file)
+if input_df is not None:
     st.subheader("Uploaded data preview")
-    st.dataframe(preview_df.head(20), use_container_width=True)
-else:
+    st.dataframe(input_df.head(20), use_container_width=True)
+elif uploaded_file is None:
     st.info("Upload a CSV file from the sidebar to preview your data and enable classification.")
 
 st.divider()
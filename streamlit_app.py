@@ -1,16 +1,40 @@
 import io
 from pathlib import Path
-from typing import Dict, Set, List
+from typing import Dict, FrozenSet, Set
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
 
+from keyword_patterns import trie_regex
+
 ###############################################################################
 # Streamlit – Marketing Keyword Classifier                                   #
 ###############################################################################
 st.set_page_config(page_title="Marketing Keyword Classifier", layout="wide")
 st.title("📈 Marketing Keyword Classifier")
 
+# ---------------------------------------------------------------------------
+# 🧩 Dictionary State – parsed only when the editor form is saved
+# ---------------------------------------------------------------------------
+
+def parse_keywords(text: str) -> FrozenSet[str]:
+    """Parse one-keyword-per-line text into a lowercased keyword set."""
+    return frozenset(kw.strip().lower() for kw in text.split("\n") if kw.strip())
+
+
+def store_dictionaries() -> None:
+    """Re-parse the submitted editor form into ``dictionaries_lower`` and ``new_category``."""
+    for label in st.session_state.dictionaries_lower:
+        st.session_state.dictionaries_lower[label] = parse_keywords(st.session_state[label])
+
+    label = st.session_state.new_label.strip().lower()
+    keywords = parse_keywords(st.session_state.new_kw_input)
+    st.session_state.new_category = (label, keywords) if label and keywords else None
+
+
 # ---------------------------------------------------------------------------
 # 🛠️ Sidebar – Upload & Configuration
 # ---------------------------------------------------------------------------
@@ -37,27 +61,33 @@ with st.sidebar:
         },
     }
 
+    if "dictionaries_lower" not in st.session_state:
+        st.session_state.dictionaries_lower = {
+            label: frozenset(keywords) for label, keywords in default_dicts.items()
+        }
+        st.session_state.new_category = None
+
+    # Edits only trigger a rerun (and re-parse) once the form is saved
+    with st.form("dict_editor"):
+        for label, keywords in default_dicts.items():
+            kw_text = "\n".join(sorted(keywords))
+            st.text_area(f"Keywords for **{label}** (one per line)", kw_text, key=label)
+
+        # Section to add a completely new category
+        st.markdown("---")
+        st.subheader("➕ Add New Category")
+        st.text_input("New category name (alphanumeric and underscores)", key="new_label")
+        st.text_area("Keywords for new category (one per line)", key="new_kw_input")
+
+        st.form_submit_button("💾 Save dictionaries", on_click=store_dictionaries)
+
     # Load edited or new dictionaries into this object
-    current_dicts: Dict[str, Set[str]] = {}
-
-    for label, keywords in default_dicts.items():
-        kw_text = "\n".join(sorted(keywords))
-        new_kw_text = st.text_area(
-            f"Keywords for **{label}** (one per line)", kw_text, key=label
-        )
-        kw_set = {kw.strip().lower() for kw in new_kw_text.split("\n") if kw.strip()}
-        if kw_set:
-            current_dicts[label] = kw_set
-
-    # Section to add a completely new category
-    st.markdown("---")
-    st.subheader("➕ Add New Category")
-    new_label = st.text_input("New category name (alphanumeric and underscores)")
-    new_kw_input = st.text_area("Keywords for new category (one per line)")
-    if new_label and new_kw_input:
-        new_kw_set = {kw.strip().lower() for kw in new_kw_input.split("\n") if kw.strip()}
-        if new_kw_set:
-            current_dicts[new_label.strip().lower()] = new_kw_set
+    current_dicts: Dict[str, FrozenSet[str]] = {
+        label: kw_set for label, kw_set in st.session_state.dictionaries_lower.items() if kw_set
+    }
+    if st.session_state.new_category is not None:
+        new_label, new_kw_set = st.session_state.new_category
+        current_dicts[new_label] = new_kw_set
 
     st.markdown("---")
     one_hot = st.checkbox("Add one‑hot encoded columns", value=True)
@@ -66,32 +96,64 @@ with st.sidebar:
 # Helper – Classification Function
 ###############################################################################
 
-def classify_statement(text: str, dictionaries: Dict[str, Set[str]]) -> List[str]:
-    """Return list of dictionary names whose keywords appear in *text*."""
-    text_lower = text.lower()
-    matched: List[str] = []
-    for label, keywords in dictionaries.items():
-        if any(kw in text_lower for kw in keywords):
-            matched.append(label)
-    return matched
+# Rows parsed and classified per pass over the uploaded CSV
+CHUNK_ROWS = 50_000
+
+@st.cache_resource(show_spinner=False)
+def keyword_pattern(keywords: FrozenSet[str]) -> str:
+    """Return the trie regex for a set of lowercased keywords, built once per set."""
+    return trie_regex(keywords)
+
+
+def classify_statements(statements: pa.Array, dictionaries: Dict[str, FrozenSet[str]]) -> Dict[str, np.ndarray]:
+    """Return one boolean array per dictionary flagging lowercased statements with a keyword hit."""
+    return {
+        label: pc.match_substring_regex(statements, keyword_pattern(keywords)).to_numpy(zero_copy_only=False)
+        for label, keywords in dictionaries.items()
+    }
 
 ###############################################################################
 # 🚀 Main – Run Classification & Display Results
 ###############################################################################
 
-def run_classifier(file_buffer: io.BytesIO, dictionaries: Dict[str, Set[str]]):
-    df = pd.read_csv(file_buffer)
-
-    if "Statement" not in df.columns:
+def classify_chunk(df: pd.DataFrame, dictionaries: Dict[str, FrozenSet[str]], one_hot: bool) -> pd.DataFrame:
+    """Add the labels (and optional one-hot) columns to one chunk of the uploaded CSV."""
+    # Lowercase and match directly with Arrow compute kernels (RE2), bypassing pandas .str
+    statements = pc.cast(pa.array(df["Statement"]), pa.large_string()).fill_null("")
+    hits = classify_statements(pc.utf8_lower(statements), dictionaries)
+    labels = list(hits)
+    if hits:
+        df["labels"] = [[label for label, hit in zip(labels, row) if hit] for row in zip(*hits.values())]
+    else:
+        df["labels"] = [[] for _ in range(len(df))]
+    if one_hot:
+        for label in labels:
+            df[label] = hits[label]
+    return df
+
+
+def classify_csv(file_buffer: io.BytesIO, dictionaries: Dict[str, FrozenSet[str]], one_hot: bool, progress=None) -> pd.DataFrame:
+    """Parse and classify the CSV in bounded chunks, reporting progress by bytes consumed."""
+    file_size = file_buffer.seek(0, io.SEEK_END)
+    file_buffer.seek(0)
+
+    chunks = []
+    for chunk in pd.read_csv(file_buffer, chunksize=CHUNK_ROWS, dtype_backend="pyarrow"):
+        chunks.append(classify_chunk(chunk, dictionaries, one_hot))
+        if progress is not None:
+            progress.progress(min(file_buffer.tell() / max(file_size, 1), 1.0), text="Classifying statements…")
+    return pd.concat(chunks)
+
+
+def run_classifier(file_buffer: io.BytesIO, dictionaries: Dict[str, FrozenSet[str]]):
+    # Check the header before parsing the whole file
+    if "Statement" not in pd.read_csv(file_buffer, nrows=0).columns:
         st.error("❌ The uploaded CSV must contain a column named 'Statement'.")
         return
 
-    # Classify
-    with st.spinner("Classifying statements…"):
-        df["labels"] = df["Statement"].astype(str).apply(classify_statement, dictionaries=dictionaries)
-        if one_hot:
-            for label in dictionaries:
-                df[label] = df["labels"].apply(lambda cats, lbl=label: lbl in cats)
+    progress = st.progress(0.0, text="Classifying statements…")
+    df = classify_csv(file_buffer, dictionaries, one_hot, progress)
+    progress.empty()
 
     st.success("✅ Classification complete!")
 
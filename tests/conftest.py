@@ -0,0 +1,43 @@
+import logging
+import runpy
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def run_page(path):
+    """Run a Streamlit script in bare mode and return its globals."""
+    logging.disable(logging.CRITICAL)
+    try:
+        return runpy.run_path(str(ROOT / path))
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+@pytest.fixture(scope="module")
+def home_page():
+    return run_page("streamlit_app.py")
+
+
+@pytest.fixture(scope="module")
+def claude_page():
+    return run_page("pages/1_claude_dictionary.py")
+
+
+@pytest.fixture(scope="module")
+def codex_page():
+    return run_page("pages/2_codex_dictionary.py")
+
+
+@pytest.fixture(params=["ahocorasick", "hyperscan"])
+def engine_module(request, claude_page, monkeypatch):
+    """Build matchers with each engine in turn; hyperscan is skipped when not installed."""
+    if request.param == "hyperscan":
+        pytest.importorskip("hyperscan")
+    else:
+        monkeypatch.setitem(claude_page["build_matcher"].__globals__, "hyperscan", None)
+    return request.param
@@ -0,0 +1,74 @@
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+
+def classify(page, dictionaries, text, overlapping=False):
+    matcher = page["build_matcher"](dictionaries)
+    return page["classify_statement"](text.lower(), matcher, list(dictionaries), overlapping)
+
+
+def test_longer_keyword_hides_nested_keyword_of_same_tactic(claude_page, engine_module):
+    dictionaries = {"urgency": ["limited", "limited time"]}
+    assert classify(claude_page, dictionaries, "Limited time offer") == {"urgency": ["limited time"]}
+    found = classify(claude_page, dictionaries, "Limited time offer", overlapping=True)
+    assert sorted(found["urgency"]) == ["limited", "limited time"]
+
+
+def test_overlap_across_tactics_keeps_both(claude_page, engine_module):
+    dictionaries = {"urgency": ["limited"], "exclusive": ["limited access", "vip"]}
+    assert classify(claude_page, dictionaries, "limited access for vip") == {
+        "urgency": ["limited"],
+        "exclusive": ["limited access", "vip"],
+    }
+
+
+@pytest.mark.parametrize("keywords, text, expected", [
+    (["sale ends soon", "ends"], "final sale ends", ["ends"]),
+    (["free gift box", "gift"], "free gift", ["gift"]),
+])
+def test_partial_longer_keyword_at_end_of_text(claude_page, engine_module, keywords, text, expected):
+    assert classify(claude_page, {"tactic": keywords}, text) == {"tactic": expected}
+
+
+def test_engines_agree_on_random_text(claude_page, monkeypatch):
+    pytest.importorskip("hyperscan")
+    rng = random.Random(0)
+    words = lambda: ["".join(rng.choice("abc ") for _ in range(rng.randint(1, 4))) for _ in range(3)]
+    module_globals = claude_page["build_matcher"].__globals__
+    for _ in range(3000):
+        dictionaries = {"first": words(), "second": words()}
+        text = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 12)))
+        hyperscan_found = [classify(claude_page, dictionaries, text, overlapping) for overlapping in (False, True)]
+        with monkeypatch.context() as patch:
+            patch.setitem(module_globals, "hyperscan", None)
+            automaton_found = [classify(claude_page, dictionaries, text, overlapping) for overlapping in (False, True)]
+        assert hyperscan_found == automaton_found, (dictionaries, text)
+
+
+def test_numeric_statement_column_with_blank_cell(claude_page):
+    df = claude_page["load_csv"](b"id,text_id\n1,10\n2,\n")
+    dictionaries = {"tactic": ["10"]}
+    result, statement_col = claude_page["process_data"](df, dictionaries, claude_page["build_matcher"](dictionaries))
+    assert statement_col == "text_id"
+    assert result["tactic_present"].tolist() == [True, False]
+
+
+def test_shared_hyperscan_matcher_across_threads(claude_page):
+    pytest.importorskip("hyperscan")
+    dictionaries = {"tactic": ["limited", "limited time", "vip"]}
+    matcher = claude_page["build_matcher"](dictionaries)
+    # Distinct statements with many hits each, so threads switch inside scan callbacks
+    df = pd.DataFrame({"Statement": [f"{i} " + "limited time for vip " * 50 for i in range(200)]})
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        try:
+            results = list(pool.map(lambda _: claude_page["process_data"](df, dictionaries, matcher)[0], range(8)))
+        finally:
+            sys.setswitchinterval(switch_interval)
+    for result in results:
+        assert result["tactic_present"].all()
@@ -0,0 +1,98 @@
+import os
+import random
+import subprocess
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from conftest import ROOT
+
+KEYWORD_MAP = {
+    "urgency_marketing": frozenset({"hurry", "last chance"}),
+    "exclusive_marketing": frozenset({"vip"}),
+}
+
+
+def test_numeric_statement_column_with_blank_cell(codex_page):
+    df = codex_page["_read_csv"](b"id,Statement\n1,10\n2,\n")
+    assert isinstance(df["Statement"].dtype, pd.ArrowDtype)
+    keyword_map = {"urgency_marketing": frozenset({"10"}), "exclusive_marketing": frozenset()}
+    result = codex_page["_apply_classification"](df, "Statement", keyword_map)
+    assert result["urgency_marketing_flag"].tolist() == [1, 0]
+    assert result["exclusive_marketing_flag"].tolist() == [0, 0]
+
+
+def chunked_statements(*chunks):
+    return pd.DataFrame({"Statement": pd.arrays.ArrowExtensionArray(pa.chunked_array(chunks, type=pa.string()))})
+
+
+def test_header_only_upload(codex_page):
+    df = codex_page["_read_csv"](b"id,Statement\n")
+    result = codex_page["_apply_classification"](df, "Statement", KEYWORD_MAP)
+    assert result.empty
+    assert list(result.columns) == ["id", "Statement", "urgency_marketing_flag", "exclusive_marketing_flag"]
+
+
+def test_multi_chunk_statement_column(codex_page):
+    df = chunked_statements(["Hurry, VIP only", None], [], ["nothing here", "last chance"])
+    result = codex_page["_apply_classification"](df, "Statement", KEYWORD_MAP)
+    assert result["urgency_marketing_flag"].tolist() == [1, 0, 0, 1]
+    assert result["exclusive_marketing_flag"].tolist() == [1, 0, 0, 0]
+
+
+CONCURRENT_SCAN = """
+import runpy, sys
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+sys.path.insert(0, {root!r})
+page = runpy.run_path({page!r})
+df = pd.DataFrame({{"Statement": [f"{{i}} hurry, vip offer " * 5 for i in range(20_000)]}})
+keyword_map = {{"urgency_marketing": frozenset({{"hurry"}}), "exclusive_marketing": frozenset({{"vip"}})}}
+with ThreadPoolExecutor(max_workers=8) as pool:
+    results = list(pool.map(lambda _: page["_apply_classification"](df, "Statement", keyword_map), range(16)))
+assert all(result["exclusive_marketing_flag"].all() for result in results)
+"""
+
+
+def test_concurrent_sessions_under_workqueue_layer():
+    pytest.importorskip("numba")
+    script = CONCURRENT_SCAN.format(root=str(ROOT), page=str(ROOT / "pages" / "2_codex_dictionary.py"))
+    env = {**os.environ, "NUMBA_THREADING_LAYER": "workqueue"}
+    completed = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr[-2000:]
+
+
+@pytest.fixture
+def without_numba(codex_page, monkeypatch):
+    """Force the compiled-regex fallback used when numba is not installed."""
+    monkeypatch.setitem(codex_page["_apply_classification"].__globals__, "_flag_kernel", lambda: None)
+
+
+def test_regex_fallback(codex_page, without_numba):
+    df = chunked_statements(["Hurry, VIP only", None], ["nothing here", "LAST CHANCE"])
+    result = codex_page["_apply_classification"](df, "Statement", KEYWORD_MAP)
+    assert result["urgency_marketing_flag"].tolist() == [1, 0, 0, 1]
+    assert result["exclusive_marketing_flag"].tolist() == [1, 0, 0, 0]
+
+    empty = codex_page["_apply_classification"](codex_page["_read_csv"](b"id,Statement\n"), "Statement", KEYWORD_MAP)
+    assert empty.empty
+
+
+def test_numba_kernel_agrees_with_regex(codex_page, monkeypatch):
+    pytest.importorskip("numba")
+    rng = random.Random(0)
+    text = lambda size: "".join(rng.choice("abé +") for _ in range(rng.randint(0, size)))
+    page_globals = codex_page["_apply_classification"].__globals__
+    for _ in range(200):
+        keyword_map = {
+            "urgency_marketing": frozenset(text(4) for _ in range(rng.randint(0, 4))) - {""},
+            "exclusive_marketing": frozenset(text(4) for _ in range(rng.randint(0, 4))) - {""},
+        }
+        df = pd.DataFrame({"Statement": [text(12) for _ in range(20)]})
+        kernel_flags = codex_page["_apply_classification"](df, "Statement", keyword_map)
+        with monkeypatch.context() as patch:
+            patch.setitem(page_globals, "_flag_kernel", lambda: None)
+            regex_flags = codex_page["_apply_classification"](df, "Statement", keyword_map)
+        pd.testing.assert_frame_equal(kernel_flags, regex_flags, obj=str(keyword_map))
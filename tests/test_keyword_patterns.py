@@ -0,0 +1,17 @@
+import random
+import re
+
+from keyword_patterns import trie_regex
+
+
+def test_shares_prefixes():
+    assert trie_regex(["limited", "limited time", "limited run"]) == r"limited(?:\ (?:run|time))?"
+
+
+def test_matches_same_statements_as_alternation():
+    rng = random.Random(0)
+    for _ in range(2000):
+        keywords = {"".join(rng.choice("ab +") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 5))}
+        text = "".join(rng.choice("ab +") for _ in range(rng.randint(0, 10)))
+        expected = any(keyword in text for keyword in keywords)
+        assert bool(re.search(trie_regex(keywords), text)) == expected, (keywords, text)
@@ -0,0 +1,63 @@
+import io
+import random
+
+import pandas as pd
+import pytest
+
+DICTIONARIES = {
+    "urgency": frozenset({"limited time", "hurry"}),
+    "exclusive": frozenset({"vip", "10"}),
+}
+
+
+@pytest.fixture
+def small_chunks(home_page, monkeypatch):
+    monkeypatch.setitem(home_page["classify_csv"].__globals__, "CHUNK_ROWS", 2)
+
+
+def test_numeric_statement_column(home_page):
+    df = pd.read_csv(io.BytesIO(b"id,Statement\n1,10\n2,\n3,7\n"), dtype_backend="pyarrow")
+    result = home_page["classify_chunk"](df, DICTIONARIES, one_hot=True)
+    assert result["labels"].tolist() == [["exclusive"], [], []]
+    assert result["exclusive"].tolist() == [True, False, False]
+
+
+def test_all_blank_statement_column(home_page):
+    df = pd.read_csv(io.BytesIO(b"id,Statement\n1,\n2,\n"), dtype_backend="pyarrow")
+    result = home_page["classify_chunk"](df, DICTIONARIES, one_hot=True)
+    assert result["labels"].tolist() == [[], []]
+    assert result["urgency"].tolist() == [False, False]
+
+
+def test_dtype_change_across_chunk_boundary(home_page, small_chunks):
+    # The first chunk parses both columns as integers, the second as strings
+    csv = b"id,Statement\n1,10\n2,20\nx3,Hurry VIP\nx4,\n5,limited time\n"
+    result = home_page["classify_csv"](io.BytesIO(csv), DICTIONARIES, one_hot=True)
+    assert result.index.tolist() == [0, 1, 2, 3, 4]
+    assert result["id"].astype(str).tolist() == ["1", "2", "x3", "x4", "5"]
+    assert result["labels"].tolist() == [["exclusive"], [], ["urgency", "exclusive"], [], ["urgency"]]
+
+
+def test_header_only_upload(home_page, small_chunks):
+    result = home_page["classify_csv"](io.BytesIO(b"id,Statement\n"), DICTIONARIES, one_hot=True)
+    assert result.empty
+    assert list(result.columns) == ["id", "Statement", "labels", "urgency", "exclusive"]
+
+
+def test_labels_and_one_hot_match_substring_check(home_page, small_chunks):
+    rng = random.Random(0)
+    text = lambda size: "".join(rng.choice("aBé +") for _ in range(rng.randint(1, size)))
+    for _ in range(100):
+        dictionaries = {f"tactic{i}": frozenset(text(3).lower() for _ in range(3)) for i in range(2)}
+        # Start with a letter so no statement is whitespace-only, which CSV parsing would blank
+        statements = [rng.choice("aB") + text(10) for _ in range(5)]
+        csv = pd.DataFrame({"Statement": statements}).to_csv(index=False).encode()
+        result = home_page["classify_csv"](io.BytesIO(csv), dictionaries, one_hot=True)
+        assert len(result) == len(statements)
+        for row, statement in zip(result.itertuples(index=False), statements):
+            expected = [
+                label for label, keywords in dictionaries.items()
+                if any(keyword in statement.lower() for keyword in keywords)
+            ]
+            assert row.labels == expected, (dictionaries, statement)
+            assert [bool(getattr(row, label)) for label in dictionaries] == [label in expected for label in dictionaries]